@@ -1,28 +1,110 @@
 #!/usr/bin/env node
 
+import {createHash} from "node:crypto";
+import {promisify} from "node:util";
+import {gzip} from "node:zlib";
 import express from "express";
-import {buildKoboRawBuffer, buildPngBuffer} from "./renderers/dashboard.js";
+import {
+    buildKoboRawBuffer,
+    buildPngBuffer,
+    RAW_BIT_DEPTHS,
+} from "./renderers/dashboard.js";
 import {initHomeAssistant} from "./clients/haClient.js";
-import {BIND_HOST, BIND_PORT, CANVAS_WIDTH, CANVAS_HEIGHT} from "./config.js";
+import {
+    BIND_HOST,
+    BIND_PORT,
+    CANVAS_WIDTH,
+    CANVAS_HEIGHT,
+    CACHE_TTL,
+} from "./config.js";
 
 initHomeAssistant();
 
 const app = express();
 
+// Renders are reused server-side for CACHE_TTL seconds; let HTTP clients
+// and proxies reuse them for as long
+const CACHE_CONTROL = CACHE_TTL > 0 ? `max-age=${CACHE_TTL}` : "no-cache";
+
+const gzipAsync = promisify(gzip);
+// buffer -> gzipped copy, so a cached render is only compressed once
+const gzipCache = new WeakMap();
+
+/**
+ * Gzip a buffer, reusing the result for the same buffer
+ * @param {Buffer} buf
+ * @returns {Promise<Buffer>}
+ */
+const gzipCached = async (buf) => {
+    let gz = gzipCache.get(buf);
+    if (!gz) {
+        // Level 1: the mostly-white frame compresses well even at the
+        // fastest setting, and the Kobo's WiFi is the slow part
+        gz = await gzipAsync(buf, {level: 1});
+        gzipCache.set(buf, gz);
+    }
+    return gz;
+}
+
+// buffer -> its ETag, so an unchanged render is only hashed once
+const etagCache = new WeakMap();
+
+/**
+ * Weak ETag for a rendered buffer, reusing the result for the same buffer
+ * @param {Buffer} buf
+ * @returns {string}
+ */
+const etagFor = (buf) => {
+    let etag = etagCache.get(buf);
+    if (!etag) {
+        const hash = createHash("sha1").update(buf).digest("base64url");
+        etag = `W/"${hash.slice(0, 16)}"`;
+        etagCache.set(buf, etag);
+    }
+    return etag;
+}
+
+/**
+ * Set the caching headers for buf and answer 304 Not Modified if the
+ * client's If-None-Match already names it
+ * @param req
+ * @param res
+ * @param {Buffer} buf
+ * @returns {boolean} true when the 304 has been sent
+ */
+const notModified = (req, res, buf) => {
+    res.set({ETag: etagFor(buf), "Cache-Control": CACHE_CONTROL});
+    if (!req.fresh) return false;
+    res.status(304).end();
+    return true;
+}
+
 /**
- * Serve RAW image for Kobo
+ * Serve RAW image for Kobo (8-bit gray, or packed with ?bpp=4 / ?bpp=1)
  * @param req
  * @param res
  * @returns {Promise<void>}
  */
 const rawImage = async (req, res) => {
     try {
-        const raw = await buildKoboRawBuffer();
+        const bpp = req.query.bpp === undefined ? 8 : Number(req.query.bpp);
+        if (!RAW_BIT_DEPTHS.includes(bpp)) {
+            res
+                .status(400)
+                .send(`bpp must be one of ${RAW_BIT_DEPTHS.join(", ")}`);
+            return;
+        }
+        const raw = await buildKoboRawBuffer(bpp);
+        res.set("Vary", "Accept-Encoding");
+        if (notModified(req, res, raw)) return;
+        const gzipped = req.acceptsEncodings("gzip") === "gzip";
+        const body = gzipped ? await gzipCached(raw) : raw;
         res.writeHead(200, {
             "Content-Type": "application/octet-stream",
-            "Content-Length": raw.length,
+            "Content-Length": body.length,
+            ...(gzipped ? {"Content-Encoding": "gzip"} : {}),
         });
-        res.end(raw);
+        res.end(body);
     } catch (e) {
         console.error("Error building RAW dashboard:", e);
         res.status(500).send(e.message || "Error building RAW dashboard");
@@ -39,6 +121,7 @@ const pngImage = async (req, res) => {
     try {
         const rotate = req.query.rotate !== "false";
         const png = await buildPngBuffer(rotate);
+        if (notModified(req, res, png)) return;
         res.writeHead(200, {
             "Content-Type": "image/png",
             "Content-Length": png.length,
@@ -3,6 +3,7 @@
 
 import WebSocket from "ws";
 import {HA_URL, HA_TOKEN, HA_HEADERS} from "../config.js";
+import {parseNumber} from "../utils/textUtils.js";
 
 const stateCache = new Map(); // entity_id -> { state, attributes }
 let cacheReady = false;
@@ -26,6 +27,42 @@ const HA_WS_URL = (() => {
     }
 })();
 
+// Timeout for HA REST calls
+const HA_REST_TIMEOUT_MS = 5000;
+
+// Origin the HA token may be sent to
+const HA_ORIGIN = (() => {
+    try {
+        return new URL(HA_URL).origin;
+    } catch {
+        return null;
+    }
+})();
+
+/**
+ * Fetch a path (or absolute URL) from HA.
+ * All HA HTTP traffic goes through here so it shares the keep-alive
+ * connection pool of Node's global fetch dispatcher, the auth headers
+ * and a request timeout. Absolute URLs on another origin (e.g. an
+ * entity_picture hosted by the weather provider) are fetched without
+ * the auth headers, so the token never leaves HA.
+ * @param {string} path
+ * @returns {Promise<Response>}
+ */
+export function haFetch(path) {
+    const url = /^https?:\/\//i.test(path) ? path : `${HA_URL}${path}`;
+    let sameOrigin = false;
+    try {
+        sameOrigin = new URL(url).origin === HA_ORIGIN;
+    } catch {
+        /* invalid URL; fetch() reports it */
+    }
+    return fetch(url, {
+        headers: sameOrigin ? HA_HEADERS : undefined,
+        signal: AbortSignal.timeout(HA_REST_TIMEOUT_MS),
+    });
+}
+
 /**
  * Set state cache from array of states
  * @param arr
@@ -42,13 +79,30 @@ function setCacheFromStatesArray(arr) {
     if (stateCache.size > 0) cacheReady = true;
 }
 
+// In-flight /api/states seed, shared by concurrent callers
+let seedInFlight = null;
+
 /**
- * Seed state cache from HA REST API
+ * Seed state cache from HA REST API.
+ * Concurrent calls share a single request.
  * @returns {Promise<void>}
  */
-async function seedStatesFromRest() {
+function seedStatesFromRest() {
+    if (!seedInFlight) {
+        seedInFlight = fetchAllStates().finally(() => {
+            seedInFlight = null;
+        });
+    }
+    return seedInFlight;
+}
+
+/**
+ * Fetch every state from HA REST API into the state cache
+ * @returns {Promise<void>}
+ */
+async function fetchAllStates() {
     try {
-        const res = await fetch(`${HA_URL}/api/states`, {headers: HA_HEADERS});
+        const res = await haFetch("/api/states");
         if (!res.ok) throw new Error(`HA /api/states HTTP ${res.status}`);
         const all = await res.json();
         setCacheFromStatesArray(all);
@@ -93,14 +147,53 @@ function scheduleReconnect() {
     }, 5000);
 }
 
+// Entities whose state_changed events update the cache (see haState())
+const trackedEntities = new Set();
+// The same ids, quoted as they appear in serialized events
+const trackedEntityTokens = [];
+
+/**
+ * Keep entities live in the state cache from now on. haState() tracks
+ * what it is asked for; registering ids up front (before the REST seed)
+ * also spares their first read a per-entity request.
+ * @param {Iterable<string>} entityIds
+ * @returns {boolean} true if any of them was not tracked yet
+ */
+export function trackEntities(entityIds) {
+    let added = false;
+    for (const id of entityIds) {
+        if (!id || trackedEntities.has(id)) continue;
+        trackedEntities.add(id);
+        trackedEntityTokens.push(`"${id}"`);
+        added = true;
+    }
+    return added;
+}
+
+/**
+ * Check whether a raw state_changed event is for an entity nothing has
+ * read, so it can be dropped without parsing
+ * @param {string} text
+ * @returns {boolean}
+ */
+function isUntrackedStateChange(text) {
+    if (!text.includes('"event_type":"state_changed"')) return false;
+    return !trackedEntityTokens.some((token) => text.includes(token));
+}
+
 /**
  * Handle incoming WebSocket message
  * @param data
  */
 function handleWsMessage(data) {
+    const text = data.toString();
+    // Every state change in HA streams through here, and attribute-heavy
+    // entities make those payloads large; skip parsing irrelevant ones
+    if (isUntrackedStateChange(text)) return;
+
     let msg;
     try {
-        msg = JSON.parse(data.toString());
+        msg = JSON.parse(text);
     } catch {
         return;
     }
@@ -216,22 +309,45 @@ function haStateFromCache(entityId) {
 }
 
 /**
- * Get state of entity
+ * Fetch one entity's state from HA REST API into the state cache
+ * @param entityId
+ * @returns {Promise<[*, object]>}
+ */
+async function fetchEntityState(entityId) {
+    const res = await haFetch(`/api/states/${entityId}`);
+    if (!res.ok) throw new Error(`HA ${entityId} HTTP ${res.status}`);
+    const data = await res.json();
+    const entry = {state: data.state, attributes: data.attributes || {}};
+    stateCache.set(entityId, entry);
+    return [entry.state, entry.attributes];
+}
+
+/**
+ * Get state of entity.
+ * Reading an entity starts tracking it (see trackEntities()). Websocket
+ * state_changed events for untracked entities are dropped, so those are
+ * not updated live; an entity first read after the cache went live is
+ * therefore fetched over REST once before the cache is trusted for it.
  * @param entityId
  * @returns {Promise<[null,{}]|[null,{}]|*|(*|{})[]|[null,{}]>}
  */
 export async function haState(entityId) {
     if (!entityId) return [null, {}];
 
+    const newlyTracked = trackEntities([entityId]);
+    if (!cacheReady) {
+        // One /api/states call fills the cache for every entity at once,
+        // instead of one request per entity
+        await seedStatesFromRest();
+    } else if (newlyTracked) {
+        // Its cached value may have missed dropped state changes
+        return fetchEntityState(entityId);
+    }
     if (cacheReady) {
         return haStateFromCache(entityId);
     }
 
-    const url = `${HA_URL}/api/states/${entityId}`;
-    const res = await fetch(url, {headers: HA_HEADERS});
-    if (!res.ok) throw new Error(`HA ${entityId} HTTP ${res.status}`);
-    const data = await res.json();
-    return [data.state, data.attributes || {}];
+    return fetchEntityState(entityId);
 }
 
 /**
@@ -243,12 +359,7 @@ export async function numericState(entityId) {
     if (!entityId) return [null, null, {}];
     try {
         const [state, attrs] = await haState(entityId);
-        if (state === "unknown" || state === "unavailable" || state == null) {
-            return [null, attrs.unit_of_measurement, attrs];
-        }
-        const v = parseFloat(state);
-        if (Number.isNaN(v)) return [null, attrs.unit_of_measurement, attrs];
-        return [v, attrs.unit_of_measurement, attrs];
+        return [parseNumber(state), attrs.unit_of_measurement, attrs];
     } catch {
         return [null, null, {}];
     }
@@ -49,6 +49,9 @@ export const CANVAS_WIDTH = 800;
 export const CANVAS_HEIGHT = 600;
 export const SKIA_USE_GPU = /^1|true|yes$/i.test(process.env.SKIA_GPU || "");
 
+// Rendered dashboard cache lifetime in seconds (0 disables)
+export const CACHE_TTL = Math.max(0, parseInt(process.env.CACHE_TTL || "30", 10) || 0);
+
 // HTTP binding
 export const BIND_HOST = process.env.BIND_HOST || "0.0.0.0";
 export const BIND_PORT = parseInt(process.env.BIND_PORT || "8080", 10);
@@ -1,94 +1,167 @@
 // weatherGraphics.js
 import {loadImage} from "skia-canvas";
-import {HA_URL, HA_HEADERS} from "../config.js";
-import {fontSpec, textSize} from "../utils/drawingUtils.js";
+import {haFetch} from "../clients/haClient.js";
+import {
+    fontSpec,
+    fontTextSize,
+    largestFittingSize,
+    fillTextCached,
+} from "../utils/drawingUtils.js";
 
 /**
- * Get icon glyph for weather condition
+ * Normalize a weather condition for icon lookup
+ * ("Partly-Cloudy", "partly cloudy" -> "partlycloudy")
  * @param {string} condition
  * @returns {string}
  */
-export function iconForCondition(condition) {
-    const c = (condition || "").toLowerCase();
-    const mapping = {
+function normalizeCondition(condition) {
+    return String(condition || "").toLowerCase().replace(/[\s-]+/g, "");
+}
+
+// Normalized HA weather condition -> icon glyph
+const ICON_MAP = new Map(
+    Object.entries({
         sunny: "☀",
         clear: "☀",
-        "clear-night": "☾",
+        clearnight: "☾",
         cloudy: "☁",
-        "partly-cloudy": "⛅",
         partlycloudy: "⛅",
-        "partly cloudy": "⛅",
         rainy: "☂",
         pouring: "☔",
         snowy: "❄",
-        "snowy-rainy": "❄☂",
+        snowyrainy: "❄☂",
         hail: "☄",
         lightning: "⚡",
-        "lightning-rainy": "⛈",
+        lightningrainy: "⛈",
         windy: "🌀",
         fog: "〰",
-        "windy-variant": "🌀☁",
+        windyvariant: "🌀☁",
         exceptional: "!",
-    };
-    for (const [key, icon] of Object.entries(mapping)) {
+    })
+);
+
+// Prefix fallback for conditions with extra suffixes, longest key first so
+// e.g. "snowyrainy" wins over "snowy"
+const ICON_PREFIXES = Object.freeze(
+    [...ICON_MAP].sort(([a], [b]) => b.length - a.length)
+);
+
+// "glyph|boxW|boxH" -> fitted fallback glyph size. Only a handful of
+// glyphs are ever drawn into the one icon box, so this stays small
+const glyphSizeCache = new Map();
+
+// entity_picture URL -> promise of its decoded image, oldest first. HA
+// serves a fixed picture per condition, so steady weather is one download
+const iconImageCache = new Map();
+const ICON_IMAGE_CACHE_SIZE = 16;
+
+/**
+ * Get icon glyph for weather condition
+ * @param {string} condition
+ * @returns {string}
+ */
+export function iconForCondition(condition) {
+    const c = normalizeCondition(condition);
+    const exact = ICON_MAP.get(c);
+    if (exact) return exact;
+    for (const [key, icon] of ICON_PREFIXES) {
         if (c.startsWith(key)) return icon;
     }
     return "·";
 }
 
+/**
+ * Download and decode the weather entity's HA entity_picture, reusing
+ * earlier downloads of the same URL
+ * @param {object} wAttrs
+ * @returns {Promise<import("skia-canvas").Image|null>} null if there is no
+ * picture or it could not be loaded
+ */
+export async function loadWeatherIcon(wAttrs) {
+    const iconUrl = wAttrs?.entity_picture;
+    if (!iconUrl || typeof iconUrl !== "string") return null;
+
+    let pending = iconImageCache.get(iconUrl);
+    if (pending) {
+        // Move to the back so it's evicted last
+        iconImageCache.delete(iconUrl);
+    } else {
+        pending = (async () => {
+            const res = await haFetch(iconUrl);
+            if (!res.ok) throw new Error(`entity_picture HTTP ${res.status}`);
+            return loadImage(Buffer.from(await res.arrayBuffer()));
+        })();
+        if (iconImageCache.size >= ICON_IMAGE_CACHE_SIZE) {
+            iconImageCache.delete(iconImageCache.keys().next().value);
+        }
+    }
+    iconImageCache.set(iconUrl, pending);
+
+    try {
+        return await pending;
+    } catch {
+        // Don't keep failures; retry the download next render
+        if (iconImageCache.get(iconUrl) === pending) {
+            iconImageCache.delete(iconUrl);
+        }
+        return null;
+    }
+}
+
 /**
  * Draw weather icon (HA entity_picture if available, otherwise glyph)
  * @param {CanvasRenderingContext2D} ctx
  * @param {[number,number,number,number]} box
  * @param {string} condition
  * @param {object} wAttrs
+ * @param {import("skia-canvas").Image|null|Promise<*>} [icon] an already
+ * loaded (or started) loadWeatherIcon(wAttrs)
  * @returns {Promise<void>}
  */
-export async function drawWeatherIcon(ctx, box, condition, wAttrs) {
+export async function drawWeatherIcon(
+    ctx,
+    box,
+    condition,
+    wAttrs,
+    icon = loadWeatherIcon(wAttrs)
+) {
     const [left, top, right, bottom] = box;
     const boxW = Math.max(1, right - left);
     const boxH = Math.max(1, bottom - top);
 
     // Try HA entity_picture first
-    let iconUrl = wAttrs?.entity_picture;
-    if (iconUrl && typeof iconUrl === "string") {
-        if (iconUrl.startsWith("/")) iconUrl = `${HA_URL}${iconUrl}`;
-        try {
-            const img = await loadImage(iconUrl, {headers: HA_HEADERS});
-            const iw = img.width || 1;
-            const ih = img.height || 1;
-            const scale = Math.min(boxW / iw, boxH / ih, 1);
-            const drawW = Math.max(1, Math.floor(iw * scale));
-            const drawH = Math.max(1, Math.floor(ih * scale));
-            const dx = left + (boxW - drawW) / 2;
-            const dy = top + (boxH - drawH) / 2;
-            ctx.drawImage(img, dx, dy, drawW, drawH);
-            return;
-        } catch {
-            // fall back to glyph
-        }
+    const img = await icon;
+    if (img) {
+        const iw = img.width || 1;
+        const ih = img.height || 1;
+        const scale = Math.min(boxW / iw, boxH / ih, 1);
+        const drawW = Math.max(1, Math.floor(iw * scale));
+        const drawH = Math.max(1, Math.floor(ih * scale));
+        const dx = left + (boxW - drawW) / 2;
+        const dy = top + (boxH - drawH) / 2;
+        ctx.drawImage(img, dx, dy, drawW, drawH);
+        return;
     }
 
     // Fallback: glyph centered in box
     const glyph = iconForCondition(condition);
-    const maxSize = Math.min(boxH - 10, 260);
-    let chosenSize = 80;
-
-    for (let size = maxSize; size >= 80; size -= 2) {
-        ctx.save();
-        ctx.font = fontSpec(size);
-        const {w} = textSize(ctx, glyph);
-        ctx.restore();
-        if (w <= boxW - 10) {
-            chosenSize = size;
-            break;
-        }
+    const sizeKey = `${glyph}|${boxW}|${boxH}`;
+    let chosenSize = glyphSizeCache.get(sizeKey);
+    if (chosenSize === undefined) {
+        const maxSize = Math.min(boxH - 10, 260);
+        chosenSize =
+            largestFittingSize(
+                maxSize,
+                80,
+                (size) => fontTextSize(fontSpec(size), glyph).w <= boxW - 10
+            ) ?? 80;
+        glyphSizeCache.set(sizeKey, chosenSize);
     }
 
     ctx.save();
     ctx.font = fontSpec(chosenSize);
     ctx.textAlign = "center";
     ctx.textBaseline = "middle";
-    ctx.fillText(glyph, (left + right) / 2, (top + bottom) / 2);
+    fillTextCached(ctx, glyph, (left + right) / 2, (top + bottom) / 2);
     ctx.restore();
 }
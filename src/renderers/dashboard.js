@@ -16,37 +16,80 @@ import {
     WASHER_POWER_ENTITY,
     DRYER_POWER_ENTITY,
     RANGE_STATE_ENTITY,
+    CACHE_TTL,
 } from "../config.js";
-import {haState, numericState, stringState} from "../clients/haClient.js";
+import {
+    haState,
+    numericState,
+    stringState,
+    trackEntities,
+} from "../clients/haClient.js";
 import {
     createBaseCanvas,
-    rotateToPortrait,
+    createPortraitCanvas,
     fontSpec,
     textSize,
     fitTextInBox,
+    drawCenteredText,
+    packGray8ToMono,
+    packGray8ToGray4,
 } from "../utils/drawingUtils.js";
 import {
     formatSpeed,
     formatPersonLocation,
     ordinalSuffix,
+    formatWeekday,
+    formatMonth,
+    formatMinuteStamp,
+    parseNumber,
 } from "../utils/textUtils.js";
-import {drawWeatherIcon} from "../gfx/weatherGraphics.js";
+import {drawWeatherIcon, loadWeatherIcon} from "../gfx/weatherGraphics.js";
 import {drawDeviceStatusIcons} from "../gfx/applianceIcons.js";
 
-/**
- * Build landscape canvas
- * @returns {Promise<import("skia-canvas").Canvas>}
- */
-export async function buildLandscapeCanvas() {
-    const {canvas, ctx} = createBaseCanvas();
-    const now = new Date();
-
-    const COND_MAX_SIZE = 56;
-    const DETAIL_MAX_SIZE = 28;
-    const LABEL_MIN_SIZE = 14;
-    const SMALL_SIZE = 18;
-    const TIME_FONT_SIZE = 10;
-
+// Font sizes
+const COND_MAX_SIZE = 56;
+const DETAIL_MAX_SIZE = 28;
+const LABEL_MIN_SIZE = 14;
+const SMALL_SIZE = 18;
+const TIME_FONT_SIZE = 10;
+
+// Fixed-size fonts
+const DETAIL_FONT = fontSpec(DETAIL_MAX_SIZE);
+const SMALL_FONT = fontSpec(SMALL_SIZE);
+const TIME_FONT = fontSpec(TIME_FONT_SIZE);
+
+// Every entity fetchDashboardData() reads, by the data field it fills
+const ENTITIES = Object.freeze({
+    weather: WEATHER_ENTITY,
+    download: DL_ENTITY,
+    upload: UL_ENTITY,
+    insideTemp: INSIDE_TEMP_ENTITY,
+    insideHum: INSIDE_HUMIDITY_ENTITY,
+    hottubTemp: HOTTUB_TEMP_ENTITY,
+    lightsOn: LIGHTS_ON_ENTITY,
+    fansOn: FANS_ON_ENTITY,
+    torrents: TORRENTS_ENTITY,
+    dave: PERSON_DAVE_ENTITY,
+    kayla: PERSON_KAYLA_ENTITY,
+    washer: WASHER_POWER_ENTITY,
+    dryer: DRYER_POWER_ENTITY,
+    range: RANGE_STATE_ENTITY,
+});
+// Track them before the first REST seed so they are live from the start
+trackEntities(Object.values(ENTITIES));
+
+// Weather attributes that may carry a "feels like" temperature, in order
+const WIND_CHILL_KEYS = Object.freeze([
+    "apparent_temperature",
+    "wind_chill",
+    "windchill",
+    "feels_like",
+    "apparent_temp",
+]);
+
+// Panel geometry in landscape coordinates. It only depends on the canvas
+// size, so it is worked out once at import rather than on every render.
+const LAYOUT = (() => {
     const margin = 12;
     const contentLeft = margin;
     const contentRight = CANVAS_WIDTH - margin;
@@ -62,17 +105,291 @@ export async function buildLandscapeCanvas() {
     const bottomHeight = contentBottom - midY;
     const bottomMidY = midY + bottomHeight / 2;
 
-    // ===== Fetch weather data =====
-    let weatherState, wAttrs;
-    try {
-        [weatherState, wAttrs] = await haState(WEATHER_ENTITY);
-    } catch (e) {
-        ctx.font = fontSpec(DETAIL_MAX_SIZE);
+    // Top-left: weather summary
+    const weatherLeft = contentLeft;
+    const weatherTop = contentTop;
+    const weatherRight = splitX;
+    const weatherBottom = midY;
+
+    const condBox = [
+        weatherLeft + 6,
+        weatherTop + 4,
+        weatherRight - 6,
+        weatherTop + 60,
+    ];
+
+    const detailStartY = condBox[3] + 6;
+    const detailBottom = weatherBottom - 6;
+    const detailRowsCount = 6;
+    const detailRowHeight = (detailBottom - detailStartY) / detailRowsCount;
+
+    // Top-right: outside temp
+    const outLeft = splitX;
+    const outTop = contentTop;
+    const outRight = contentRight;
+    const outBottom = midY;
+
+    const outsideHeaderBox = [
+        outLeft + 8,
+        outTop + 4,
+        outRight - 8,
+        outTop + 40,
+    ];
+    const tempValueBox = [
+        outLeft + 8,
+        outsideHeaderBox[3] + 6,
+        outRight - 8,
+        outBottom - 40,
+    ];
+    const wcBox = [outLeft + 8, outBottom - 36, outRight - 8, outBottom - 8];
+
+    // Bottom-left: 2x2 grid
+    const blLeft = contentLeft;
+    const blTop = midY;
+    const blRight = splitX;
+    const blBottom = contentBottom;
+
+    const insideCell = [blLeft, blTop, leftMidX, bottomMidY];
+    const hotTubCell = [leftMidX, blTop, blRight, bottomMidY];
+    const humCell = [blLeft, bottomMidY, leftMidX, blBottom];
+    const iconCell = [leftMidX, bottomMidY, blRight, blBottom];
+
+    const timeBandHeight = TIME_FONT_SIZE + 6;
+    const iconBox = [
+        iconCell[0] + 6,
+        iconCell[1] + 6,
+        iconCell[2] - 6,
+        iconCell[3] - 6 - timeBandHeight,
+    ];
+
+    // Bottom-right: location rows, date and appliances
+    const brLeft = splitX;
+    const brTop = midY;
+    const brRight = contentRight;
+    const brBottom = contentBottom;
+
+    const locBoxBottom = brTop + (brBottom - brTop) * 0.5;
+    const dateBoxTop = locBoxBottom;
+
+    const locBox = [brLeft, brTop, brRight, locBoxBottom];
+
+    const locRowsTop = locBox[1] + 6;
+    const locRowsBottom = locBox[3] - 6;
+    const locMidX = locBox[0] + (locBox[2] - locBox[0]) / 2;
+
+    // Date box (left side of bottom-right)
+    const dateBox = [brLeft, dateBoxTop, brRight, brBottom];
+
+    const dateLeft = dateBox[0];
+    const dateTop = dateBox[1];
+    const dateRight = dateBox[2];
+    const dateBottom = dateBox[3];
+
+    const dateW = dateRight - dateLeft;
+
+    const dowAreaW = Math.min(dateW * 0.3, 80);
+    const dowArea = [dateLeft, dateTop, dateLeft + dowAreaW, dateBottom];
+
+    const rightArea = [dateLeft + dowAreaW, dateTop, locMidX, dateBottom];
+
+    // Appliances block in the empty bottom-right square
+    const devicesBox = [locMidX, dateBoxTop, brRight, brBottom];
+
+    return Object.freeze({
+        margin,
+        contentLeft,
+        contentRight,
+        contentTop,
+        contentBottom,
+        splitX,
+        midY,
+        leftMidX,
+        bottomMidY,
+        weatherLeft,
+        weatherRight,
+        condBox,
+        detailStartY,
+        detailBottom,
+        detailRowsCount,
+        detailRowHeight,
+        outsideHeaderBox,
+        tempValueBox,
+        wcBox,
+        insideCell,
+        hotTubCell,
+        humCell,
+        iconCell,
+        iconBox,
+        brLeft,
+        brRight,
+        brBottom,
+        locBoxBottom,
+        locBox,
+        locRowsTop,
+        locRowsBottom,
+        locMidX,
+        dowArea,
+        rightArea,
+        devicesBox,
+    });
+})();
+
+/**
+ * Draw a sensor cell: small label across the top, large value below
+ * @param {CanvasRenderingContext2D} ctx
+ * @param {[number,number,number,number]} cell
+ * @param {string} label
+ * @param {string} value
+ */
+function drawSensorCell(ctx, cell, label, value) {
+    const labelBox = [cell[0] + 6, cell[1] + 4, cell[2] - 6, cell[1] + 26];
+    drawCenteredText(ctx, label, labelBox, 22, LABEL_MIN_SIZE);
+
+    const valueBox = [cell[0] + 6, labelBox[3] + 4, cell[2] - 6, cell[3] - 6];
+    drawCenteredText(ctx, value, valueBox, 80, 28);
+}
+
+/**
+ * Fetch everything the dashboard shows from HA.
+ * The result is plain data (no Dates or Errors), so it can be compared
+ * between renders.
+ * @returns {Promise<object>}
+ */
+export async function fetchDashboardData() {
+    // The reads are independent, so issue them all at once
+    const [
+        weatherRes,
+        transmissionRes,
+        insideTempRes,
+        insideHumRes,
+        hottubTempRes,
+        lightsOnRes,
+        fansOnRes,
+        torrentsRes,
+        daveRes,
+        kaylaRes,
+        washerRes,
+        dryerRes,
+        rangeRes,
+    ] = await Promise.allSettled([
+        haState(ENTITIES.weather),
+        Promise.all([haState(ENTITIES.download), haState(ENTITIES.upload)]),
+        numericState(ENTITIES.insideTemp),
+        numericState(ENTITIES.insideHum),
+        numericState(ENTITIES.hottubTemp),
+        numericState(ENTITIES.lightsOn),
+        numericState(ENTITIES.fansOn),
+        numericState(ENTITIES.torrents),
+        stringState(ENTITIES.dave),
+        stringState(ENTITIES.kayla),
+        stringState(ENTITIES.washer),
+        stringState(ENTITIES.dryer),
+        stringState(ENTITIES.range),
+    ]);
+
+    // numericState/stringState never reject
+    return {
+        // Everything time-based on the dashboard has minute resolution
+        minute: Math.floor(Date.now() / 60000),
+        weather: weatherRes.status === "fulfilled" ? weatherRes.value : null,
+        weatherError:
+            weatherRes.status === "rejected" ? String(weatherRes.reason) : null,
+        transmission:
+            transmissionRes.status === "fulfilled" ? transmissionRes.value : null,
+        insideTemp: insideTempRes.value,
+        insideHum: insideHumRes.value,
+        hottubTemp: hottubTempRes.value,
+        lightsOn: lightsOnRes.value,
+        fansOn: fansOnRes.value,
+        torrents: torrentsRes.value,
+        dave: daveRes.value,
+        kayla: kaylaRes.value,
+        washer: washerRes.value,
+        dryer: dryerRes.value,
+        range: rangeRes.value,
+    };
+}
+
+/**
+ * Build landscape canvas
+ * @param {object} [data] result of fetchDashboardData()
+ * @param {object} [options]
+ * @param {boolean} [options.portrait] draw the layout pre-rotated onto a
+ * portrait canvas (USB on the right) instead of a landscape one
+ * @param {boolean} [options.scratch] draw into the shared scratch canvas
+ * (see createBaseCanvas()) instead of a new one
+ * @param {import("skia-canvas").Image|null} [options.weatherIcon] the
+ * already loaded loadWeatherIcon() result; downloaded here if omitted
+ * @returns {Promise<import("skia-canvas").Canvas>}
+ */
+export async function buildLandscapeCanvas(
+    data,
+    {portrait = false, scratch = false, weatherIcon} = {}
+) {
+    if (!data) data = await fetchDashboardData();
+    const createCanvas = portrait ? createPortraitCanvas : createBaseCanvas;
+    const {canvas, ctx} = createCanvas(
+        CANVAS_WIDTH,
+        CANVAS_HEIGHT,
+        "#ffffff",
+        scratch
+    );
+    const now = new Date(data.minute * 60000);
+    const {
+        margin,
+        contentLeft,
+        contentRight,
+        contentTop,
+        contentBottom,
+        splitX,
+        midY,
+        leftMidX,
+        bottomMidY,
+        weatherLeft,
+        weatherRight,
+        condBox,
+        detailStartY,
+        detailBottom,
+        detailRowsCount,
+        detailRowHeight,
+        outsideHeaderBox,
+        tempValueBox,
+        wcBox,
+        insideCell,
+        hotTubCell,
+        humCell,
+        iconCell,
+        iconBox,
+        brLeft,
+        brRight,
+        brBottom,
+        locBoxBottom,
+        locBox,
+        locRowsTop,
+        locRowsBottom,
+        locMidX,
+        dowArea,
+        rightArea,
+        devicesBox,
+    } = LAYOUT;
+
+    // ===== HA data =====
+    if (!data.weather) {
+        ctx.font = DETAIL_FONT;
         ctx.fillText("Error reading weather", margin, margin);
-        ctx.font = fontSpec(SMALL_SIZE);
-        ctx.fillText(String(e), margin, margin + DETAIL_MAX_SIZE + 4);
+        ctx.font = SMALL_FONT;
+        ctx.fillText(
+            String(data.weatherError),
+            margin,
+            margin + DETAIL_MAX_SIZE + 4
+        );
         return canvas;
     }
+    const [weatherState, wAttrs] = data.weather;
+    // Without a preloaded icon, start the download now so it overlaps
+    // drawing the other panels
+    const icon =
+        weatherIcon !== undefined ? weatherIcon : loadWeatherIcon(wAttrs);
 
     const condition = weatherState;
     const temp = wAttrs.temperature;
@@ -90,49 +407,31 @@ export async function buildLandscapeCanvas() {
     const windBearing = wAttrs.wind_bearing;
 
     let windChillValue = null;
-    for (const key of [
-        "apparent_temperature",
-        "wind_chill",
-        "windchill",
-        "feels_like",
-        "apparent_temp",
-    ]) {
-        const v = wAttrs[key];
-        if (v != null && v !== "unknown" && v !== "unavailable") {
-            const n = parseFloat(v);
-            if (!Number.isNaN(n)) {
-                windChillValue = n;
-                break;
-            }
-        }
+    for (const key of WIND_CHILL_KEYS) {
+        windChillValue = parseNumber(wAttrs[key]);
+        if (windChillValue != null) break;
     }
 
     // Transmission
-    let dlText = "—";
-    let ulText = "—";
-    try {
-        const [dlState, dlAttrs] = await haState(DL_ENTITY);
-        const [ulState, ulAttrs] = await haState(UL_ENTITY);
+    let dlText = "ERR";
+    let ulText = "ERR";
+    if (data.transmission) {
+        const [[dlState, dlAttrs], [ulState, ulAttrs]] = data.transmission;
         dlText = formatSpeed(dlState, dlAttrs);
         ulText = formatSpeed(ulState, ulAttrs);
-    } catch {
-        dlText = "ERR";
-        ulText = "ERR";
     }
 
     // Inside sensors
-    const [insideTempVal, insideTempUnit] = await numericState(INSIDE_TEMP_ENTITY);
-    const [insideHumVal] = await numericState(INSIDE_HUMIDITY_ENTITY);
-    const [hottubTempVal, hottubTempUnit] = await numericState(
-        HOTTUB_TEMP_ENTITY
-    );
+    const [insideTempVal, insideTempUnit] = data.insideTemp;
+    const [insideHumVal] = data.insideHum;
+    const [hottubTempVal, hottubTempUnit] = data.hottubTemp;
 
     // Location / counts
-    const [lightsOnVal] = await numericState(LIGHTS_ON_ENTITY);
-    const [fansOnVal] = await numericState(FANS_ON_ENTITY);
-    const [torrentCount] = await numericState(TORRENTS_ENTITY);
-    const [daveRaw] = await stringState(PERSON_DAVE_ENTITY);
-    const [kaylaRaw] = await stringState(PERSON_KAYLA_ENTITY);
+    const [lightsOnVal] = data.lightsOn;
+    const [fansOnVal] = data.fansOn;
+    const [torrentCount] = data.torrents;
+    const [daveRaw] = data.dave;
+    const [kaylaRaw] = data.kayla;
 
     const daveLoc = formatPersonLocation(daveRaw);
     const kaylaLoc = formatPersonLocation(kaylaRaw);
@@ -143,54 +442,26 @@ export async function buildLandscapeCanvas() {
         torrentCount != null ? String(Math.round(torrentCount)) : "—";
 
     // Appliance states
-    const [washerRaw] = await stringState(WASHER_POWER_ENTITY);
-    const [dryerRaw] = await stringState(DRYER_POWER_ENTITY);
-    const [rangeRaw] = await stringState(RANGE_STATE_ENTITY);
+    const [washerRaw] = data.washer;
+    const [dryerRaw] = data.dryer;
+    const [rangeRaw] = data.range;
 
     const washerOn = String(washerRaw || "").toLowerCase() === "on";
     const dryerOn = String(dryerRaw || "").toLowerCase() === "on";
     const ovenOn = String(rangeRaw || "").toLowerCase() === "running";
 
     // ===== TOP-LEFT: Weather summary =====
-    const weatherLeft = contentLeft;
-    const weatherTop = contentTop;
-    const weatherRight = splitX;
-    const weatherBottom = midY;
-
-    const condBox = [
-        weatherLeft + 6,
-        weatherTop + 4,
-        weatherRight - 6,
-        weatherTop + 60,
-    ];
     const condText =
         (condition || "").charAt(0).toUpperCase() + (condition || "").slice(1);
-    {
-        const {font, w, h} = fitTextInBox(
-            ctx,
-            condText,
-            condBox,
-            COND_MAX_SIZE,
-            LABEL_MIN_SIZE
-        );
-        ctx.font = font;
-        const cx = (condBox[0] + condBox[2]) / 2;
-        const cy = (condBox[1] + condBox[3]) / 2;
-        ctx.fillText(condText, cx - w / 2, cy - h / 2);
-    }
-
-    const detailStartY = condBox[3] + 6;
-    const detailBottom = weatherBottom - 6;
-    const detailRowsCount = 6;
-    const detailRowHeight = (detailBottom - detailStartY) / detailRowsCount;
+    drawCenteredText(ctx, condText, condBox, COND_MAX_SIZE, LABEL_MIN_SIZE);
 
     const detailTexts = (() => {
         const humStr = humidityOut != null ? `${humidityOut}%` : "\u2014";
         const presStr = pressure != null ? `${pressure} hPa` : "\u2014";
         let windStr = "—";
         if (windSpeed != null) {
-            const n = parseFloat(windSpeed);
-            const speed = !Number.isNaN(n)
+            const n = parseNumber(windSpeed);
+            const speed = n != null
                 ? `${n.toFixed(1)} ${windSpeedUnit}`
                 : `${windSpeed} ${windSpeedUnit}`;
             const bearing = windBearing ? ` ${windBearing}` : "";
@@ -210,6 +481,8 @@ export async function buildLandscapeCanvas() {
     })();
 
     const detailRowBounds = [];
+    // Most rows fit at the same size; only hand skia a new font on change
+    let detailFont = null;
 
     for (let i = 0; i < detailRowsCount; i++) {
         const rowTop = detailStartY + i * detailRowHeight;
@@ -226,120 +499,38 @@ export async function buildLandscapeCanvas() {
             DETAIL_MAX_SIZE,
             LABEL_MIN_SIZE
         );
-        ctx.font = font;
+        if (font !== detailFont) {
+            ctx.font = font;
+            detailFont = font;
+        }
         const y = rowTop + (rowBottom - rowTop - h) / 2;
         ctx.fillText(text, box[0], y);
     }
 
     // ===== TOP-RIGHT: Outside temp =====
-    const outLeft = splitX;
-    const outTop = contentTop;
-    const outRight = contentRight;
-    const outBottom = midY;
-
-    const outsideHeaderBox = [
-        outLeft + 8,
-        outTop + 4,
-        outRight - 8,
-        outTop + 40,
-    ];
-    {
-        const headerText = "Outside Temp";
-        const {font, w, h} = fitTextInBox(
-            ctx,
-            headerText,
-            outsideHeaderBox,
-            28,
-            16
-        );
-        ctx.font = font;
-        const cx = (outsideHeaderBox[0] + outsideHeaderBox[2]) / 2;
-        const cy = (outsideHeaderBox[1] + outsideHeaderBox[3]) / 2;
-        ctx.fillText(headerText, cx - w / 2, cy - h / 2);
-    }
+    drawCenteredText(ctx, "Outside Temp", outsideHeaderBox, 28, 16);
 
     let tempStr = "\u2014";
     if (temp != null) {
-        const n = parseFloat(temp);
-        tempStr = !Number.isNaN(n) ? `${n.toFixed(0)}${tempUnit}` : `${temp}${tempUnit}`;
+        const n = parseNumber(temp);
+        tempStr = n != null ? `${n.toFixed(0)}${tempUnit}` : `${temp}${tempUnit}`;
     }
 
-    const tempValueBox = [
-        outLeft + 8,
-        outsideHeaderBox[3] + 6,
-        outRight - 8,
-        outBottom - 40,
-    ];
-    {
-        const {font, w, h} = fitTextInBox(ctx, tempStr, tempValueBox, 180, 70);
-        ctx.font = font;
-        const cx = (tempValueBox[0] + tempValueBox[2]) / 2;
-        const cy = (tempValueBox[1] + tempValueBox[3]) / 2;
-        ctx.fillText(tempStr, cx - w / 2, cy - h / 2);
-    }
+    drawCenteredText(ctx, tempStr, tempValueBox, 180, 70, {cached: true});
 
     if (windChillValue != null) {
-        const n = parseFloat(windChillValue);
-        const wcStr = !Number.isNaN(n)
-            ? `[${n.toFixed(0)}${tempUnit} wind chill]`
-            : `[${windChillValue} ${tempUnit} wind chill]`;
-        const wcBox = [outLeft + 8, outBottom - 36, outRight - 8, outBottom - 8];
-        const {font, w, h} = fitTextInBox(ctx, wcStr, wcBox, 22, 12);
-        ctx.font = font;
-        const cx = (wcBox[0] + wcBox[2]) / 2;
-        const cy = (wcBox[1] + wcBox[3]) / 2;
-        ctx.fillText(wcStr, cx - w / 2, cy - h / 2);
+        const wcStr = `[${windChillValue.toFixed(0)}${tempUnit} wind chill]`;
+        drawCenteredText(ctx, wcStr, wcBox, 22, 12);
     }
 
     // ===== BOTTOM-LEFT: 2x2 grid =====
-    const blLeft = contentLeft;
-    const blTop = midY;
-    const blRight = splitX;
-    const blBottom = contentBottom;
-
-    const insideCell = [blLeft, blTop, leftMidX, bottomMidY];
-    const hotTubCell = [leftMidX, blTop, blRight, bottomMidY];
-    const humCell = [blLeft, bottomMidY, leftMidX, blBottom];
-    const iconCell = [leftMidX, bottomMidY, blRight, blBottom];
-
     // Inside temp
     let insideTempText = "\u2014";
     if (insideTempVal != null) {
         const unit = insideTempUnit || "°C";
         insideTempText = `${insideTempVal.toFixed(1)}${unit}`;
     }
-    {
-        const label = "Inside Temp";
-        const labelBox = [
-            insideCell[0] + 6,
-            insideCell[1] + 4,
-            insideCell[2] - 6,
-            insideCell[1] + 26,
-        ];
-        const {font, w, h} = fitTextInBox(
-            ctx,
-            label,
-            labelBox,
-            22,
-            LABEL_MIN_SIZE
-        );
-        ctx.font = font;
-        const cx = (labelBox[0] + labelBox[2]) / 2;
-        const cy = (labelBox[1] + labelBox[3]) / 2;
-        ctx.fillText(label, cx - w / 2, cy - h / 2);
-
-        const valueBox = [
-            insideCell[0] + 6,
-            labelBox[3] + 4,
-            insideCell[2] - 6,
-            insideCell[3] - 6,
-        ];
-        const vMetrics = fitTextInBox(ctx, insideTempText, valueBox, 80, 28);
-        ctx.font = vMetrics.font;
-        const vcx = (valueBox[0] + valueBox[2]) / 2;
-        const vcy = (valueBox[1] + valueBox[3]) / 2;
-        ctx.fillText(insideTempText, vcx - vMetrics.w / 2, vcy - vMetrics.h / 2);
-    }
+    drawSensorCell(ctx, insideCell, "Inside Temp", insideTempText);
 
     // Hot tub
     let hottubTempText = "\u2014";
@@ -347,88 +538,17 @@ export async function buildLandscapeCanvas() {
         const unit = hottubTempUnit || "°C";
         hottubTempText = `${hottubTempVal.toFixed(1)}${unit}`;
     }
-    {
-        const label = "Hot Tub Temp";
-        const labelBox = [
-            hotTubCell[0] + 6,
-            hotTubCell[1] + 4,
-            hotTubCell[2] - 6,
-            hotTubCell[1] + 26,
-        ];
-        const {font, w, h} = fitTextInBox(
-            ctx,
-            label,
-            labelBox,
-            22,
-            LABEL_MIN_SIZE
-        );
-        ctx.font = font;
-        const cx = (labelBox[0] + labelBox[2]) / 2;
-        const cy = (labelBox[1] + labelBox[3]) / 2;
-        ctx.fillText(label, cx - w / 2, cy - h / 2);
-
-        const valueBox = [
-            hotTubCell[0] + 6,
-            labelBox[3] + 4,
-            hotTubCell[2] - 6,
-            hotTubCell[3] - 6,
-        ];
-        const vMetrics = fitTextInBox(ctx, hottubTempText, valueBox, 80, 28);
-        ctx.font = vMetrics.font;
-        const vcx = (valueBox[0] + valueBox[2]) / 2;
-        const vcy = (valueBox[1] + valueBox[3]) / 2;
-        ctx.fillText(hottubTempText, vcx - vMetrics.w / 2, vcy - vMetrics.h / 2);
-    }
+    drawSensorCell(ctx, hotTubCell, "Hot Tub Temp", hottubTempText);
 
     // Inside humidity
     let humText = "\u2014";
     if (insideHumVal != null) humText = `${insideHumVal.toFixed(0)}%`;
-    {
-        const label = "Inside Humidity";
-        const labelBox = [
-            humCell[0] + 6,
-            humCell[1] + 4,
-            humCell[2] - 6,
-            humCell[1] + 26,
-        ];
-        const {font, w, h} = fitTextInBox(
-            ctx,
-            label,
-            labelBox,
-            22,
-            LABEL_MIN_SIZE
-        );
-        ctx.font = font;
-        const cx = (labelBox[0] + labelBox[2]) / 2;
-        const cy = (labelBox[1] + labelBox[3]) / 2;
-        ctx.fillText(label, cx - w / 2, cy - h / 2);
-
-        const valueBox = [
-            humCell[0] + 6,
-            labelBox[3] + 4,
-            humCell[2] - 6,
-            humCell[3] - 6,
-        ];
-        const vMetrics = fitTextInBox(ctx, humText, valueBox, 80, 28);
-        ctx.font = vMetrics.font;
-        const vcx = (valueBox[0] + valueBox[2]) / 2;
-        const vcy = (valueBox[1] + valueBox[3]) / 2;
-        ctx.fillText(humText, vcx - vMetrics.w / 2, vcy - vMetrics.h / 2);
-    }
+    drawSensorCell(ctx, humCell, "Inside Humidity", humText);
 
     // Icon + timestamp
-    const timeBandHeight = TIME_FONT_SIZE + 6;
-    {
-        const iconBox = [
-            iconCell[0] + 6,
-            iconCell[1] + 6,
-            iconCell[2] - 6,
-            iconCell[3] - 6 - timeBandHeight,
-        ];
-        await drawWeatherIcon(ctx, iconBox, condition, wAttrs);
-    }
-    const timestampText = now.toISOString().slice(0, 16).replace("T", " ");
-    ctx.font = fontSpec(TIME_FONT_SIZE);
+    await drawWeatherIcon(ctx, iconBox, condition, wAttrs, icon);
+    const timestampText = formatMinuteStamp(data.minute);
+    ctx.font = TIME_FONT;
     const {w: tsW, h: tsH} = textSize(ctx, timestampText);
     const tsCx = (iconCell[0] + iconCell[2]) / 2;
     const tsX = tsCx - tsW / 2;
@@ -436,19 +556,6 @@ export async function buildLandscapeCanvas() {
     ctx.fillText(timestampText, tsX, tsY);
 
     // ===== BOTTOM-RIGHT: Location + Date + Appliances block =====
-    const brLeft = splitX;
-    const brTop = midY;
-    const brRight = contentRight;
-    const brBottom = contentBottom;
-
-    const locBoxBottom = brTop + (brBottom - brTop) * 0.5;
-    const dateBoxTop = locBoxBottom;
-
-    const locBox = [brLeft, brTop, brRight, locBoxBottom];
-
-    const locRowsTop = locBox[1] + 6;
-    const locRowsBottom = locBox[3] - 6;
-
     const locRowsData = [
         {label: "Dave", value: daveLoc},
         {label: "Kayla", value: kaylaLoc},
@@ -459,7 +566,6 @@ export async function buildLandscapeCanvas() {
 
     const locRowCount = locRowsData.length;
     const locRowHeight = (locRowsBottom - locRowsTop) / locRowCount;
-    const locMidX = locBox[0] + (locBox[2] - locBox[0]) / 2;
 
     const locRowBounds = [];
 
@@ -475,57 +581,16 @@ export async function buildLandscapeCanvas() {
         const rightBox = [locMidX + 4, rowTop + 2, locBox[2] - 8, rowBottom - 2];
         const verticalNudge = 2;
 
-        {
-            const {font, w, h} = fitTextInBox(
-                ctx,
-                row.label,
-                leftBox,
-                22,
-                LABEL_MIN_SIZE
-            );
-            ctx.font = font;
-            const cx = (leftBox[0] + leftBox[2]) / 2;
-            const cy = (leftBox[1] + leftBox[3]) / 2;
-            const textY = cy - h / 2 - verticalNudge;
-            ctx.fillText(row.label, cx - w / 2, textY);
-        }
-        {
-            const {font, w, h} = fitTextInBox(
-                ctx,
-                row.value,
-                rightBox,
-                24,
-                LABEL_MIN_SIZE
-            );
-            ctx.font = font;
-            const cx = (rightBox[0] + rightBox[2]) / 2;
-            const cy = (rightBox[1] + rightBox[3]) / 2;
-            const textY = cy - h / 2 - verticalNudge;
-            ctx.fillText(row.value, cx - w / 2, textY);
-        }
+        drawCenteredText(ctx, row.label, leftBox, 22, LABEL_MIN_SIZE, {
+            nudgeY: verticalNudge,
+        });
+        drawCenteredText(ctx, row.value, rightBox, 24, LABEL_MIN_SIZE, {
+            nudgeY: verticalNudge,
+        });
     }
 
-    // Date box (left side of bottom-right)
-    const dateBox = [brLeft, dateBoxTop, brRight, brBottom];
-
-    const dateLeft = dateBox[0];
-    const dateTop = dateBox[1];
-    const dateRight = dateBox[2];
-    const dateBottom = dateBox[3];
-
-    const dateW = dateRight - dateLeft;
-
-    const dowAreaW = Math.min(dateW * 0.3, 80);
-    const dowArea = [dateLeft, dateTop, dateLeft + dowAreaW, dateBottom];
-
-    const rightArea = [dateLeft + dowAreaW, dateTop, locMidX, dateBottom];
-
-    const dow = now
-        .toLocaleString("en-US", {weekday: "short"})
-        .toUpperCase();
-    const monthAbbr = now
-        .toLocaleString("en-US", {month: "short"})
-        .toUpperCase();
+    const dow = formatWeekday(now);
+    const monthAbbr = formatMonth(now);
 
     {
         const [dl, dt, dr, db] = dowArea;
@@ -614,7 +679,6 @@ export async function buildLandscapeCanvas() {
     }
 
     // Appliances block in the empty bottom-right square
-    const devicesBox = [locMidX, dateBoxTop, brRight, brBottom];
     drawDeviceStatusIcons(ctx, devicesBox, {washerOn, dryerOn, ovenOn});
 
     // ===== GRID LINES =====
@@ -694,14 +758,104 @@ export async function buildLandscapeCanvas() {
     return canvas;
 }
 
+// output key -> { ts, stateKey, buffer } of the last render
+const renderCache = new Map();
+// output key -> in-flight render promise
+const pendingRenders = new Map();
+// Renders draw into shared scratch canvases, so run them one at a time
+let renderQueue = Promise.resolve();
+
+/**
+ * Run a render once every previously queued render has finished
+ * @param {() => Promise<Buffer>} fn
+ * @returns {Promise<Buffer>}
+ */
+function enqueueRender(fn) {
+    const run = renderQueue.then(fn);
+    renderQueue = run.catch(() => {});
+    return run;
+}
+
+/**
+ * Return the cached buffer for key if it is younger than CACHE_TTL,
+ * otherwise fetch fresh HA data and only redraw if it differs from
+ * what the cached buffer was drawn from. Concurrent requests for the
+ * same key share a single in-flight render.
+ * @param {string} key
+ * @param {(data: object, weatherIcon: *) => Promise<Buffer>} render called
+ * with the data and its preloaded weather icon
+ * @returns {Promise<Buffer>}
+ */
+async function cachedRender(key, render) {
+    const hit = renderCache.get(key);
+    if (hit && performance.now() - hit.ts < CACHE_TTL * 1000) return hit.buffer;
+
+    let pending = pendingRenders.get(key);
+    if (!pending) {
+        pending = (async () => {
+            const data = await fetchDashboardData();
+            const stateKey = JSON.stringify(data);
+            const last = renderCache.get(key);
+            let buffer;
+            if (last && last.stateKey === stateKey) {
+                buffer = last.buffer;
+            } else {
+                // Download the icon before queueing, so a slow or broken
+                // entity_picture doesn't hold up every other render
+                const weatherIcon = await loadWeatherIcon(data.weather?.[1]);
+                buffer = await enqueueRender(() => render(data, weatherIcon));
+            }
+            renderCache.set(key, {ts: performance.now(), stateKey, buffer});
+            return buffer;
+        })().finally(() => pendingRenders.delete(key));
+        pendingRenders.set(key, pending);
+    }
+    return pending;
+}
+
+// Packed bit depths served alongside the 8-bit default
+const RAW_PACKERS = new Map([
+    [1, packGray8ToMono],
+    [4, packGray8ToGray4],
+]);
+// Every bit depth buildKoboRawBuffer() can produce
+export const RAW_BIT_DEPTHS = Object.freeze([...RAW_PACKERS.keys(), 8]);
+// 8-bit raw buffer -> Map(bpp -> packed copy), so repeat pulls reuse it
+const packedBuffers = new WeakMap();
+
 /**
  * Build Kobo raw buffer
+ * @param {number} [bpp] 8 for Gray8 (what pickel expects), 4 or 1 for
+ * packed pixels at 1/2 or 1/8 of the size
  * @returns {Promise<Buffer>}
+ * @throws {RangeError} for any other bpp
  */
-export async function buildKoboRawBuffer() {
-    const landscape = await buildLandscapeCanvas();
-    const portrait = rotateToPortrait(landscape);
-    return portrait.toBuffer("raw", {colorType: "Gray8"});
+export async function buildKoboRawBuffer(bpp = 8) {
+    if (!RAW_BIT_DEPTHS.includes(bpp)) {
+        throw new RangeError(`Unsupported bpp: ${bpp}`);
+    }
+    const gray = await cachedRender("raw", async (data, weatherIcon) => {
+        const portrait = await buildLandscapeCanvas(data, {
+            portrait: true,
+            scratch: true,
+            weatherIcon,
+        });
+        return portrait.toBuffer("raw", {colorType: "Gray8"});
+    });
+    if (bpp === 8) return gray;
+    const pack = RAW_PACKERS.get(bpp);
+
+    let packed = packedBuffers.get(gray);
+    if (!packed) {
+        packed = new Map();
+        packedBuffers.set(gray, packed);
+    }
+    let out = packed.get(bpp);
+    if (!out) {
+        out = pack(gray, CANVAS_HEIGHT, CANVAS_WIDTH);
+        packed.set(bpp, out);
+    }
+    return out;
 }
 
 /**
@@ -710,7 +864,13 @@ export async function buildKoboRawBuffer() {
  * @returns {Promise<Buffer>}
  */
 export async function buildPngBuffer(rotate = true) {
-    const landscape = await buildLandscapeCanvas();
-    const portrait = rotate ? rotateToPortrait(landscape) : landscape;
-    return portrait.toBuffer("png");
+    const key = rotate ? "png" : "png-landscape";
+    return cachedRender(key, async (data, weatherIcon) => {
+        const canvas = await buildLandscapeCanvas(data, {
+            portrait: rotate,
+            scratch: true,
+            weatherIcon,
+        });
+        return canvas.toBuffer("png");
+    });
 }
@@ -2,37 +2,145 @@
 import {Canvas} from "skia-canvas";
 import {CANVAS_WIDTH, CANVAS_HEIGHT, SKIA_USE_GPU} from "../config.js";
 
+// size -> font spec string, built once per size for the life of the process
+const fontSpecCache = new Map();
+
 /**
  * Generate font spec string
  * @param {number} size
  * @returns {string}
  */
 export function fontSpec(size) {
-    // Try DejaVu first, then FreeSans, then Noto Emoji as a last resort
-    return `${size}px "DejaVu Sans","FreeSans","Noto Emoji",sans-serif`;
+    let spec = fontSpecCache.get(size);
+    if (spec === undefined) {
+        // Try DejaVu first, then FreeSans, then Noto Emoji as a last resort
+        spec = `${size}px "DejaVu Sans","FreeSans","Noto Emoji",sans-serif`;
+        fontSpecCache.set(size, spec);
+    }
+    return spec;
 }
 
+// "font|baseline|text" -> measured size, oldest first
+const textSizeCache = new Map();
+const TEXT_SIZE_CACHE_SIZE = 1024;
+// Private 1x1 context used only for measuring
+let measureCtx = null;
+
 /**
- * Measure text size
+ * Measure text size with the context's current font and baseline
  * @param {CanvasRenderingContext2D} ctx
  * @param {string} text
  * @returns {{w: number, h: number}}
  */
 export function textSize(ctx, text) {
+    return fontTextSize(ctx.font, text, ctx.textBaseline);
+}
+
+/**
+ * Measure text size for a font spec.
+ * Metrics only depend on the font, baseline and text, so they are taken
+ * on a private context (probing sizes never touches the drawing context)
+ * and cached, since the same strings are measured at the same sizes on
+ * every render.
+ * @param {string} font
+ * @param {string} text
+ * @param {CanvasTextBaseline} [baseline]
+ * @returns {{w: number, h: number}}
+ */
+export function fontTextSize(font, text, baseline = "top") {
     const t = text || "";
-    const m = ctx.measureText(t);
+    const key = `${font}|${baseline}|${t}`;
+    const cached = textSizeCache.get(key);
+    if (cached) return cached;
+
+    const size = measureTextSize(font, baseline, t);
+    if (textSizeCache.size >= TEXT_SIZE_CACHE_SIZE) {
+        textSizeCache.delete(textSizeCache.keys().next().value);
+    }
+    textSizeCache.set(key, size);
+    return size;
+}
+
+/**
+ * Measure text size without the cache
+ * @param {string} font
+ * @param {CanvasTextBaseline} baseline
+ * @param {string} t
+ * @returns {{w: number, h: number}}
+ */
+function measureTextSize(font, baseline, t) {
+    if (!measureCtx) measureCtx = new Canvas(1, 1).getContext("2d");
+    measureCtx.font = font;
+    measureCtx.textBaseline = baseline;
+    const m = measureCtx.measureText(t);
     const w = m.width || 0;
     let h =
         (m.actualBoundingBoxAscent || m.emHeightAscent || 0) +
         (m.actualBoundingBoxDescent || m.emHeightDescent || 0);
 
     if (!h) {
-        const match = /(\d+)px/.exec(ctx.font);
+        const match = /(\d+)px/.exec(font);
         h = match ? parseInt(match[1], 10) : 16;
     }
     return {w, h};
 }
 
+/**
+ * Find the largest of maxSize, maxSize - 2, ... >= minSize for which
+ * fits(size) holds, by binary search (fits must be monotonic in size)
+ * @param {number} maxSize
+ * @param {number} minSize
+ * @param {(size: number) => boolean} fits
+ * @param {number} [guess] expected answer; when it is close, checking it
+ * and its neighbour settles the search in two calls
+ * @returns {number|null} null when no candidate fits
+ */
+export function largestFittingSize(maxSize, minSize, fits, guess) {
+    let lo = 0;
+    let hi = Math.floor((maxSize - minSize) / 2);
+    let best = null;
+    if (guess != null && hi > 0) {
+        const g = Math.min(hi, Math.max(0, Math.round((maxSize - guess) / 2)));
+        if (fits(maxSize - g * 2)) {
+            best = maxSize - g * 2;
+            hi = g - 1;
+            // The next size up doesn't fit: the guess was the answer
+            if (hi < 0 || !fits(maxSize - hi * 2)) return best;
+            best = maxSize - hi * 2;
+            hi--;
+        } else {
+            lo = g + 1;
+            if (lo > hi) return null;
+            // The next size down fits: that is the answer
+            if (fits(maxSize - lo * 2)) return maxSize - lo * 2;
+            lo++;
+        }
+    }
+    while (lo <= hi) {
+        const mid = (lo + hi) >> 1;
+        const size = maxSize - mid * 2;
+        if (fits(size)) {
+            best = size;
+            hi = mid - 1;
+        } else {
+            lo = mid + 1;
+        }
+    }
+    return best;
+}
+
+/**
+ * Rough font size at which text fills box, from its length alone
+ * (glyphs average a bit over half an em wide)
+ * @param {string} text
+ * @param {number} boxW
+ * @param {number} boxH
+ * @returns {number}
+ */
+function estimateFontSize(text, boxW, boxH) {
+    return Math.min(boxH, (boxW * 1.6) / Math.max(1, (text || "").length));
+}
+
 /**
  * Fit text in box by adjusting font size
  * @param {CanvasRenderingContext2D} ctx
@@ -47,38 +155,148 @@ export function fitTextInBox(ctx, text, box, maxSize, minSize) {
     const boxW = Math.max(1, right - left);
     const boxH = Math.max(1, bottom - top);
 
-    for (let size = maxSize; size >= minSize; size -= 2) {
-        ctx.save();
-        ctx.font = fontSpec(size);
-        const {w, h} = textSize(ctx, text);
-        ctx.restore();
-        if (w <= boxW && h <= boxH) {
-            return {font: fontSpec(size), w, h};
+    const baseline = ctx.textBaseline;
+    const measure = (size) => fontTextSize(fontSpec(size), text, baseline);
+
+    const fits = (s) => {
+        const {w, h} = measure(s);
+        return w <= boxW && h <= boxH;
+    };
+    const guess = estimateFontSize(text, boxW, boxH);
+    const size = largestFittingSize(maxSize, minSize, fits, guess) ?? minSize;
+    const {w, h} = measure(size);
+    return {font: fontSpec(size), w, h};
+}
+
+/**
+ * Fit text in box and draw it centered there
+ * @param {CanvasRenderingContext2D} ctx
+ * @param {string} text
+ * @param {[number,number,number,number]} box
+ * @param {number} maxSize
+ * @param {number} minSize
+ * @param {{nudgeY?: number, cached?: boolean}} [options] nudgeY lifts the
+ * text by that many pixels; cached draws through fillTextCached()
+ * @returns {{font: string, w: number, h: number}}
+ */
+export function drawCenteredText(
+    ctx,
+    text,
+    box,
+    maxSize,
+    minSize,
+    {nudgeY = 0, cached = false} = {}
+) {
+    const metrics = fitTextInBox(ctx, text, box, maxSize, minSize);
+    ctx.font = metrics.font;
+    const cx = (box[0] + box[2]) / 2;
+    const cy = (box[1] + box[3]) / 2;
+    const x = cx - metrics.w / 2;
+    const y = cy - metrics.h / 2 - nudgeY;
+    if (cached) fillTextCached(ctx, text, x, y);
+    else ctx.fillText(text, x, y);
+    return metrics;
+}
+
+// "font|align|baseline|fill|text" -> pre-rendered text bitmap, oldest first
+const textBitmapCache = new Map();
+const TEXT_BITMAP_CACHE_SIZE = 64;
+
+/**
+ * fillText() through a cache of pre-rendered bitmaps, for large text whose
+ * rasterization is the expensive part (big temperatures, icon glyphs).
+ * The first call renders the text into a tight offscreen canvas using the
+ * context's current font, alignment and fill; later calls just blit it.
+ * The anchor is rounded to whole pixels so the blit does not resample.
+ * @param {CanvasRenderingContext2D} ctx
+ * @param {string} text
+ * @param {number} x
+ * @param {number} y
+ */
+export function fillTextCached(ctx, text, x, y) {
+    const key = [
+        ctx.font,
+        ctx.textAlign,
+        ctx.textBaseline,
+        ctx.fillStyle,
+        text,
+    ].join("|");
+    let entry = textBitmapCache.get(key);
+    if (entry) {
+        // Move to the back so it is evicted last
+        textBitmapCache.delete(key);
+    } else {
+        const m = ctx.measureText(text);
+        const left = Math.max(0, Math.ceil(m.actualBoundingBoxLeft || 0));
+        const right = Math.max(0, Math.ceil(m.actualBoundingBoxRight || 0));
+        const ascent = Math.max(0, Math.ceil(m.actualBoundingBoxAscent || 0));
+        const descent = Math.max(0, Math.ceil(m.actualBoundingBoxDescent || 0));
+        if (left + right === 0 || ascent + descent === 0) {
+            // No usable metrics; draw directly rather than cache a clipped bitmap
+            ctx.fillText(text, x, y);
+            return;
         }
-    }
 
-    ctx.save();
-    ctx.font = fontSpec(minSize);
-    const {w, h} = textSize(ctx, text);
-    ctx.restore();
-    return {font: fontSpec(minSize), w, h};
+        // 1px of slack around the ink for antialiasing
+        const ax = left + 1;
+        const ay = ascent + 1;
+        const bitmap = new Canvas(ax + right + 1, ay + descent + 1, {
+            gpu: SKIA_USE_GPU,
+        });
+        const bctx = bitmap.getContext("2d");
+        bctx.font = ctx.font;
+        bctx.textAlign = ctx.textAlign;
+        bctx.textBaseline = ctx.textBaseline;
+        bctx.fillStyle = ctx.fillStyle;
+        bctx.fillText(text, ax, ay);
+        entry = {bitmap, ax, ay};
+
+        if (textBitmapCache.size >= TEXT_BITMAP_CACHE_SIZE) {
+            textBitmapCache.delete(textBitmapCache.keys().next().value);
+        }
+    }
+    textBitmapCache.set(key, entry);
+    ctx.drawImage(
+        entry.bitmap,
+        Math.round(x) - entry.ax,
+        Math.round(y) - entry.ay
+    );
 }
 
+// "WxH" -> reusable scratch {canvas, ctx}
+const scratchCanvases = new Map();
+
 /**
  * Create a base white canvas with sensible text defaults.
  * Useful for any screen.
+ * With reuse, the same canvas is handed back (wiped and reset) on every
+ * call for a given size instead of allocating a new one, so callers must
+ * be done with it, including any encode, before asking again.
  * @param {number} [width]
  * @param {number} [height]
  * @param {string} [background]
+ * @param {boolean} [reuse]
  * @returns {{canvas: Canvas, ctx: CanvasRenderingContext2D}}
  */
 export function createBaseCanvas(
     width = CANVAS_WIDTH,
     height = CANVAS_HEIGHT,
-    background = "#ffffff"
+    background = "#ffffff",
+    reuse = false
 ) {
-    const canvas = new Canvas(width, height, {gpu: SKIA_USE_GPU});
-    const ctx = canvas.getContext("2d");
+    const key = `${width}x${height}`;
+    let entry = reuse ? scratchCanvases.get(key) : null;
+    if (!entry) {
+        const canvas = new Canvas(width, height, {gpu: SKIA_USE_GPU});
+        entry = {canvas, ctx: canvas.getContext("2d")};
+        if (reuse) scratchCanvases.set(key, entry);
+    }
+    const {canvas, ctx} = entry;
+
+    // Undo anything a previous render left behind on a reused canvas
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    ctx.lineWidth = 1;
+    ctx.strokeStyle = "#000000";
 
     ctx.fillStyle = background;
     ctx.fillRect(0, 0, width, height);
@@ -90,6 +308,30 @@ export function createBaseCanvas(
     return {canvas, ctx};
 }
 
+/**
+ * Create a base white portrait canvas whose context is pre-rotated so
+ * landscape coordinates land where rotateToPortrait() would put them
+ * (USB on the right). Drawing straight into it avoids a second canvas
+ * and a full-image rotate blit.
+ * Default dimensions: 600x800 drawn with 800x600 coordinates.
+ * @param {number} [width] landscape width
+ * @param {number} [height] landscape height
+ * @param {string} [background]
+ * @param {boolean} [reuse] see createBaseCanvas()
+ * @returns {{canvas: Canvas, ctx: CanvasRenderingContext2D}}
+ */
+export function createPortraitCanvas(
+    width = CANVAS_WIDTH,
+    height = CANVAS_HEIGHT,
+    background = "#ffffff",
+    reuse = false
+) {
+    const {canvas, ctx} = createBaseCanvas(height, width, background, reuse);
+    ctx.translate(0, width);
+    ctx.rotate(-Math.PI / 2);
+    return {canvas, ctx};
+}
+
 /**
  * Rotate a landscape canvas to portrait (USB on the right)
  * Default dimensions: 600x800 from 800x600.
@@ -116,3 +358,45 @@ export function rotateToPortrait(
 
     return rotated;
 }
+
+/**
+ * Pack an 8-bit grayscale buffer into 1 bit per pixel (MSB first,
+ * 1 = white, rows padded to a whole byte), thresholding at mid-gray
+ * @param {Buffer} gray
+ * @param {number} width
+ * @param {number} height
+ * @returns {Buffer}
+ */
+export function packGray8ToMono(gray, width, height) {
+    const rowBytes = Math.ceil(width / 8);
+    const out = Buffer.alloc(rowBytes * height);
+    for (let y = 0; y < height; y++) {
+        const src = y * width;
+        const dst = y * rowBytes;
+        for (let x = 0; x < width; x++) {
+            if (gray[src + x] >= 128) out[dst + (x >> 3)] |= 0x80 >> (x & 7);
+        }
+    }
+    return out;
+}
+
+/**
+ * Pack an 8-bit grayscale buffer into 4 bits per pixel (high nibble
+ * first, 0 = black, 15 = white, rows padded to a whole byte)
+ * @param {Buffer} gray
+ * @param {number} width
+ * @param {number} height
+ * @returns {Buffer}
+ */
+export function packGray8ToGray4(gray, width, height) {
+    const rowBytes = Math.ceil(width / 2);
+    const out = Buffer.alloc(rowBytes * height);
+    for (let y = 0; y < height; y++) {
+        const src = y * width;
+        const dst = y * rowBytes;
+        for (let x = 0; x < width; x++) {
+            out[dst + (x >> 1)] |= (gray[src + x] >> 4) << (x & 1 ? 0 : 4);
+        }
+    }
+    return out;
+}
@@ -1,5 +1,17 @@
 // textUtils.js
 
+// Intl formatters are costly to construct (Date#toLocaleString builds a
+// new one per call), so build them once
+const WEEKDAY_FORMAT = new Intl.DateTimeFormat("en-US", {weekday: "short"});
+const MONTH_FORMAT = new Intl.DateTimeFormat("en-US", {month: "short"});
+
+// HA placeholders for an entity or attribute without a value
+const MISSING_STATES = new Set(["unknown", "unavailable"]);
+
+// Last formatted minute stamp; it only changes once a minute
+let stampMinute = null;
+let stampText = "";
+
 /**
  * Title-case a string (underscores -> spaces, capitalize words)
  * @param {string} str
@@ -47,6 +59,18 @@ export function ordinalSuffix(n) {
     }
 }
 
+/**
+ * Parse a numeric HA state or attribute
+ * @param {*} value
+ * @returns {number|null} null when missing or not a number
+ */
+export function parseNumber(value) {
+    if (typeof value === "number") return Number.isNaN(value) ? null : value;
+    if (value == null || MISSING_STATES.has(value)) return null;
+    const n = parseFloat(value);
+    return Number.isNaN(n) ? null : n;
+}
+
 /**
  * Format speed state with unit
  * @param {string|null} state
@@ -54,9 +78,43 @@ export function ordinalSuffix(n) {
  * @returns {string}
  */
 export function formatSpeed(state, attrs) {
-    if (state === "unknown" || state === "unavailable" || state == null) return "–";
+    if (state == null || MISSING_STATES.has(state)) return "–";
     const unit = attrs?.unit_of_measurement || "";
-    const n = parseFloat(state);
-    if (!Number.isNaN(n)) return `${n.toFixed(1)} ${unit}`.trim();
+    const n = parseNumber(state);
+    if (n != null) return `${n.toFixed(1)} ${unit}`.trim();
     return `${state} ${unit}`.trim();
 }
+
+/**
+ * Format short upper-case weekday ("MON")
+ * @param {Date} date
+ * @returns {string}
+ */
+export function formatWeekday(date) {
+    return WEEKDAY_FORMAT.format(date).toUpperCase();
+}
+
+/**
+ * Format short upper-case month ("JAN")
+ * @param {Date} date
+ * @returns {string}
+ */
+export function formatMonth(date) {
+    return MONTH_FORMAT.format(date).toUpperCase();
+}
+
+/**
+ * Format a minute since the epoch as "YYYY-MM-DD HH:MM" (UTC)
+ * @param {number} minute
+ * @returns {string}
+ */
+export function formatMinuteStamp(minute) {
+    if (minute !== stampMinute) {
+        stampText = new Date(minute * 60000)
+            .toISOString()
+            .slice(0, 16)
+            .replace("T", " ");
+        stampMinute = minute;
+    }
+    return stampText;
+}